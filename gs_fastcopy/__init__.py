@@ -3,8 +3,9 @@ gs_fastcopy: optimized file transfer to and from Google Cloud Storage.
 
 gs_fastcopy provides a stream interface around the XML Multipart Upload
 API (which only works with files) for optimized reading and writing. It
-also wraps the command-line tools `pigz` and `unpigz` (parallel gzip)
-for faster (de)compression, if available.
+also performs multi-threaded gzip (de)compression in-process using
+ISA-L (`isal`), if available, falling back to the command-line tools
+`pigz` and `unpigz` (parallel gzip).
 
 See also the `read()` and `write()` functions.
 """
@@ -13,14 +14,45 @@ import os
 import shutil
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
+from functools import lru_cache
 
+from google.auth.exceptions import DefaultCredentialsError
 from google.cloud import storage
 from google.cloud.storage import transfer_manager
 
+# isal's igzip_threaded module provides in-process, multi-threaded
+# gzip (de)compression backed by the ISA-L library. Compared to the
+# external pigz/unpigz tools, it avoids the fork/exec overhead and
+# streams directly to/from the caller, so the (de)compressed data
+# never needs a second copy on disk. It's an optional dependency;
+# when missing we fall back to the external tools.
+try:
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+# rapidgzip parallelizes decompression of a *single* gzip stream by
+# indexing block boundaries and inflating disjoint regions on
+# separate cores -- something neither unpigz nor isal can do (gzip
+# decode is otherwise inherently serial). Internally it uses the
+# pugz scheme: decode speculatively from mid-stream offsets, then
+# patch unresolved back-references in a second pass. That's the
+# only sound way to split arbitrary single-stream gzip (Deflate has
+# no reliable sync markers to scan for), and it's exactly why we
+# lean on rapidgzip for on-disk archives rather than attempting a
+# split ourselves. It needs a seekable file, so streamed downloads
+# go through isal instead. Also an optional dependency.
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
 
 @contextmanager
-def read(gs_uri, billing_project=None):
+def read(gs_uri, max_workers=None, chunk_size=None, billing_project=None):
     """
     Context manager for reading a file from Google Cloud Storage.
     Compresses and decompresses files on the fly, if necessary.
@@ -42,50 +74,132 @@ def read(gs_uri, billing_project=None):
     for reading. When the 'with' block exits, the handle is closed and
     the temporary directory is deleted.
 
-    If the gs_uri ends with '.gz', the file is decompressed before
-    reading. Note that the decompression is performed in an external
-    process, not streaming in memory. This means you need enough disk
-    space for the compressed file, and the decompressed file, together.
+    If the gs_uri ends with '.gz', the file is decompressed while
+    reading. With `isal` installed, cloud objects are decompressed
+    as their bytes arrive from the network, without staging the
+    compressed file on disk; local files stream in-process as the
+    caller reads. Otherwise, an external tool decompresses the file
+    first, and you need enough disk space for the compressed file,
+    and the decompressed file, together.
 
     :param gs_uri: The Google Cloud Storage URI to read from.
+    :param max_workers: The maximum number of workers to use. None for default (available CPUs).
+    :param chunk_size: The size of each chunk to download. None for default.
     :param billing_project: The billing project for the transfer (default: app default credentials quota project).
     """
-    # If true, don't delete the compressed file after decompression.
-    keep_archive = False
-
-    with tempfile.TemporaryDirectory() as tmp:
-        buffer_file_name = os.path.join(
-            tmp, "download.gz" if gs_uri.endswith(".gz") else "download"
-        )
+    if max_workers is None:
+        max_workers = _get_available_cpus()
 
+    if (
+        gs_uri.startswith("gs://")
+        and gs_uri.endswith(".gz")
+        and igzip_threaded is not None
+    ):
+        # Stream the object straight into the decompressor: bytes are
+        # inflated as they arrive from the network, overlapping the
+        # download with decompression, and the compressed data never
+        # touches disk.
+        try:
+            gs_blob = _gs_blob(gs_uri, billing_project)
+        except DefaultCredentialsError:
+            # No SDK credentials: fall through to the on-disk path,
+            # which can download with the gcloud tool instead.
+            gs_blob = None
+
+        if gs_blob is not None:
+            with gs_blob.open("rb") as gz_stream:
+                with igzip_threaded.open(
+                    gz_stream, "rb", threads=_get_available_cpus()
+                ) as f:
+                    yield f
+            return
+
+    # Estimate the staged size, to stage in RAM when it fits.
+    if gs_uri.startswith("gs://"):
+        try:
+            estimated_size = _blob_size(_gs_blob(gs_uri, billing_project))
+        except DefaultCredentialsError:
+            estimated_size = None
+    else:
+        try:
+            estimated_size = os.path.getsize(gs_uri)
+        except OSError:
+            estimated_size = None
+
+    # With neither in-process decompressor available, the external
+    # tool stages the *decompressed* output in the scratch dir too,
+    # and gzip ratios routinely blow past any safe margin over the
+    # compressed size we estimated. Treat the size as unknown so
+    # the scratch dir stays on disk rather than filling a tmpfs.
+    if gs_uri.endswith(".gz") and rapidgzip is None and igzip_threaded is None:
+        estimated_size = None
+
+    with tempfile.TemporaryDirectory(dir=_scratch_dir(estimated_size)) as tmp:
         if gs_uri.startswith("gs://"):
-            _download_gs_uri(gs_uri, buffer_file_name, billing_project)
+            downloaded = True
+            buffer_file_name = os.path.join(
+                tmp, "download.gz" if gs_uri.endswith(".gz") else "download"
+            )
+            _download_gs_uri(
+                gs_uri, buffer_file_name, max_workers, chunk_size, billing_project
+            )
+            # The decompressor (or caller) scans the download
+            # start-to-finish: let the kernel read ahead.
+            _fadvise(buffer_file_name, "POSIX_FADV_SEQUENTIAL")
         else:
-            # Create a symlink to the local file, to avoid copying,
-            # while reusing the decompression code. Note that we
-            # add --keep to not delete the file after decompression.
-            # Note that we need the abspath to support relative uris.
-            keep_archive = True
-            os.symlink(os.path.abspath(gs_uri), buffer_file_name)
+            # Read local files in place: no copy, no symlink. Note
+            # that we need the abspath to support relative uris.
+            downloaded = False
+            buffer_file_name = os.path.abspath(gs_uri)
 
         # If necessary, decompress the file before reading.
         if buffer_file_name.endswith(".gz"):
+            if rapidgzip is not None:
+                # Decompress in-process on all cores: rapidgzip
+                # inflates disjoint regions of the archive in
+                # parallel, and the handle is seekable.
+                with rapidgzip.open(
+                    buffer_file_name, parallelization=_get_available_cpus()
+                ) as f:
+                    yield f
+                return
+
+            if igzip_threaded is not None:
+                # Decompress in-process, streaming as the caller
+                # reads: no rename, no second file on disk.
+                with igzip_threaded.open(
+                    buffer_file_name, "rb", threads=_get_available_cpus()
+                ) as f:
+                    yield f
+                return
+
             # unpigz is a parallel gunzip implementation that's
-            # much faster when hardware is available.
-            tool = "unpigz" if shutil.which("unpigz") else "gunzip"
-
-            # See notes for keep_archive=True
-            command = (
-                [tool, "--keep", "--force", buffer_file_name]
-                if keep_archive
-                else [tool, buffer_file_name]
-            )
+            # much faster when hardware is available. Resolve the
+            # absolute path: with it (and close_fds=False below),
+            # CPython spawns via posix_spawn/vfork instead of
+            # fork+exec, avoiding a page-table copy of the parent
+            # -- a memory-proportional stall for large-heap callers.
+            tool = _which("unpigz") or _which("gunzip")
+            if tool is None:
+                raise Exception(
+                    "No decompression tool found on PATH (tried unpigz, gunzip)"
+                )
 
-            result = subprocess.run(
-                command,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-            )
+            # Pipe the archive through the tool instead of naming it
+            # on the command line. Reading stdin and writing stdout
+            # sidesteps the tools' file handling entirely: no unlink
+            # of the input, no --keep/--force, and the output lands
+            # in our scratch dir regardless of where the archive is.
+            out_file_name = os.path.join(tmp, "decompressed")
+            with open(buffer_file_name, "rb") as fin:
+                with open(out_file_name, "wb") as fout:
+                    result = subprocess.run(
+                        [tool, "-d", "-c"],
+                        stdin=fin,
+                        stdout=fout,
+                        stderr=subprocess.PIPE,
+                        close_fds=False,
+                    )
 
             # TODO: handle errors better than this
             if result.returncode != 0:
@@ -93,15 +207,26 @@ def read(gs_uri, billing_project=None):
                     f"Failed to extract file downloaded from {gs_uri}: stderr: {result.stderr}"
                 )
 
-            # Remove the '.gz' extension from the filename (like the tools do)
-            buffer_file_name = buffer_file_name[:-3]
+            # A downloaded archive has served its purpose: drop it so
+            # scratch holds one copy of the data, not two.
+            if downloaded:
+                os.unlink(buffer_file_name)
+
+            buffer_file_name = out_file_name
 
         with open(buffer_file_name, "rb") as f:
             yield f
 
 
 @contextmanager
-def write(gs_uri, max_workers=None, chunk_size=None, billing_project=None):
+def write(
+    gs_uri,
+    max_workers=None,
+    chunk_size=None,
+    billing_project=None,
+    compress="auto",
+    worker_type=None,
+):
     """
     Context manager for writing a file to Google Cloud Storage.
     Compresses and decompresses files on the fly, if necessary.
@@ -121,60 +246,207 @@ def write(gs_uri, max_workers=None, chunk_size=None, billing_project=None):
     the 'with' block exits, the file is uploaded to the specified
     Google Cloud Storage URI, and the temporary directory is deleted.
 
-    If the gs_uri ends with '.gz', the file is compressed before
-    uploading. Note that the compression is performed in an external
-    process, not streaming in memory. This means you need enough disk
-    space for the uncompressed file, and the compressed file, together.
+    If the gs_uri ends with '.gz', the file is compressed while
+    writing. With `isal` installed, the caller's writes are
+    compressed inline in-process; otherwise they are piped through
+    an external tool. Either way, only the compressed file touches
+    disk.
 
     :param gs_uri: The Google Cloud Storage URI to write to.
     :param max_workers: The maximum number of workers to use. None for default (available CPUs).
     :param chunk_size: The size of each chunk to upload. None for default.
     :param billing_project: The billing project for the transfer (default: app default credentials quota project).
+    :param compress: 'auto' (default) compresses when the URI ends with '.gz'.
+        'always' compresses regardless; uploads without the '.gz' suffix are
+        marked Content-Encoding: gzip so readers decode them transparently.
+        'never' skips local compression, e.g. for pre-compressed payloads or
+        when the network is fast enough that compression is the bottleneck.
+    :param worker_type: 'process' or 'thread' for the chunked upload's
+        workers. None for the transfer manager's default. Processes dodge
+        the GIL on checksum-heavy uploads; threads skip the fork cost,
+        which can win for smaller files.
     """
 
     if max_workers is None:
         max_workers = _get_available_cpus()
 
+    if compress not in ("auto", "always", "never"):
+        raise ValueError(
+            f"compress must be 'auto', 'always', or 'never', not {compress!r}"
+        )
+
+    should_compress = (
+        gs_uri.endswith(".gz") if compress == "auto" else compress == "always"
+    )
+
+    # Objects compressed without the '.gz' suffix get marked with
+    # Content-Encoding: gzip, so readers (and GCS transcoding) see
+    # the decompressed contents.
+    content_encoding = (
+        "gzip" if should_compress and not gs_uri.endswith(".gz") else None
+    )
+
     # Create a temporary scratch directory.
     # Will be deleted when the 'with' closes.
     with tempfile.TemporaryDirectory() as tmp_dir:
         # We need an actual filename within the scratch directory.
         buffer_file_name = os.path.join(tmp_dir, "file_to_upload")
 
-        # Yield the file object for the caller to write.
-        with open(buffer_file_name, "wb") as tmp_file:
-            yield tmp_file
-
-        # If requested, compress the file before uploading.
-        if gs_uri.endswith(".gz"):
+        if should_compress and igzip_threaded is not None:
+            # Compress inline as the caller writes: only the
+            # compressed file ever touches disk.
+            buffer_file_name += ".gz"
+            with igzip_threaded.open(
+                buffer_file_name, "wb", threads=_get_available_cpus()
+            ) as tmp_file:
+                yield tmp_file
+        elif should_compress:
+            # Without isal, pipe the caller's writes through the
+            # compressor's stdin rather than staging the uncompressed
+            # file and compressing it in a second pass: only the
+            # compressed file ever touches disk.
+            #
             # pigz is a parallel gzip implementation that's
-            # much faster when hardware is available.
-            tool = "pigz" if shutil.which("pigz") else "gzip"
-
-            # TODO: handle errors
-            result = subprocess.run(
-                [tool, buffer_file_name],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-            )
+            # much faster when hardware is available. The absolute
+            # path plus close_fds=False lets CPython spawn via
+            # posix_spawn/vfork rather than fork+exec (see read()).
+            tool = _which("pigz") or _which("gzip")
+            if tool is None:
+                raise Exception("No compression tool found on PATH (tried pigz, gzip)")
+
+            buffer_file_name += ".gz"
+            with open(buffer_file_name, "wb") as gz_file:
+                process = subprocess.Popen(
+                    [tool, "-c"],
+                    stdin=subprocess.PIPE,
+                    stdout=gz_file,
+                    stderr=subprocess.PIPE,
+                    close_fds=False,
+                )
+
+                try:
+                    yield process.stdin
+                finally:
+                    # Closing stdin signals end-of-input; the
+                    # compressor exits once it finishes writing.
+                    process.stdin.close()
+                    stderr = process.stderr.read()
+                    process.wait()
 
             # TODO: handle errors better than this
-            if result.returncode != 0:
+            if process.returncode != 0:
                 raise Exception(
-                    f"Failed to compress file for upload to {gs_uri}: stderr: {result.stderr}"
+                    f"Failed to compress file for upload to {gs_uri}: stderr: {stderr}"
                 )
-
-            # Add the '.gz' extension to the filename (like the tools do)
-            buffer_file_name += ".gz"
+        else:
+            # Yield the file object for the caller to write.
+            with open(buffer_file_name, "wb") as tmp_file:
+                yield tmp_file
 
         if gs_uri.startswith("gs://"):
+            # The uploader reads the buffer start-to-finish: let the
+            # kernel read ahead. Afterward, drop the buffer's pages
+            # -- it's about to be deleted, and for multi-GB files
+            # they'd otherwise crowd out the caller's working set.
+            _fadvise(buffer_file_name, "POSIX_FADV_SEQUENTIAL")
             _write_gs_uri(
-                buffer_file_name, gs_uri, max_workers, chunk_size, billing_project
+                buffer_file_name,
+                gs_uri,
+                max_workers,
+                chunk_size,
+                billing_project,
+                content_encoding,
+                worker_type,
             )
+            _fadvise(buffer_file_name, "POSIX_FADV_DONTNEED")
         else:
             # If the URI is not a gs:// URI, it's a local file path.
             # In this case, we can just move the file to the destination.
-            shutil.move(buffer_file_name, gs_uri)
+            _move_file(buffer_file_name, gs_uri)
+
+
+def read_many(gs_uris, dest_dir, max_workers=None, billing_project=None):
+    """
+    Download many files concurrently, yielding them as they land.
+
+    read() pays its setup cost (chunked-transfer negotiation, worker
+    pool) once per file, which swamps the actual transfer for
+    workloads of many small objects. This instead issues one plain
+    GET per object over a shared thread pool and client.
+
+    Usage example:
+
+    ```
+    for gs_uri, file_name in gs_fastcopy.read_many(uris, '/tmp/stage'):
+        process(file_name)
+    ```
+
+    Each object is written to dest_dir under its base name, and
+    (gs_uri, file_name) pairs are yielded in completion order. No
+    decompression is applied: objects land byte-for-byte.
+
+    :param gs_uris: The Google Cloud Storage URIs to read from.
+    :param dest_dir: The directory to write the files into.
+    :param max_workers: The maximum number of workers to use. None
+        for default (4x available CPUs; downloads are I/O bound).
+    :param billing_project: The billing project for the transfer (default: app default credentials quota project).
+    """
+    if max_workers is None:
+        max_workers = _get_available_cpus() * 4
+
+    def download_one(gs_uri):
+        file_name = os.path.join(dest_dir, os.path.basename(gs_uri))
+        _gs_blob(gs_uri, billing_project).download_to_filename(
+            file_name, checksum="crc32c"
+        )
+        return gs_uri, file_name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(download_one, gs_uri) for gs_uri in gs_uris]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_many(pairs, max_workers=None, billing_project=None):
+    """
+    Upload many files concurrently, yielding them as they complete.
+
+    The counterpart to read_many(): one plain PUT per file over a
+    shared thread pool and client, amortizing per-call setup across
+    a workload of many small files.
+
+    Usage example:
+
+    ```
+    pairs = [('out/a.json', 'gs://my-bucket/a.json'), ...]
+    for file_name, gs_uri in gs_fastcopy.write_many(pairs):
+        print(f'uploaded {gs_uri}')
+    ```
+
+    (file_name, gs_uri) pairs are yielded in completion order. No
+    compression is applied: files are uploaded byte-for-byte.
+
+    :param pairs: (file_name, gs_uri) pairs to upload.
+    :param max_workers: The maximum number of workers to use. None
+        for default (4x available CPUs; uploads are I/O bound).
+    :param billing_project: The billing project for the transfer (default: app default credentials quota project).
+    """
+    if max_workers is None:
+        max_workers = _get_available_cpus() * 4
+
+    def upload_one(file_name, gs_uri):
+        _gs_blob(gs_uri, billing_project).upload_from_filename(
+            file_name, checksum="crc32c"
+        )
+        return file_name, gs_uri
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(upload_one, file_name, gs_uri)
+            for file_name, gs_uri in pairs
+        ]
+        for future in as_completed(futures):
+            yield future.result()
 
 
 # Helper function to get the number of available CPUs.
@@ -182,6 +454,9 @@ def write(gs_uri, max_workers=None, chunk_size=None, billing_project=None):
 # using schedule affinity; that is a more accurate
 # measure of available CPUs if available. If not,
 # fall back to os.cpu_count().
+# Cached: this is consulted on every transfer (and per worker
+# sizing decision), and the affinity mask doesn't change under us.
+@lru_cache(maxsize=1)
 def _get_available_cpus():
     try:
         return len(os.sched_getaffinity(0))
@@ -189,7 +464,192 @@ def _get_available_cpus():
         return os.cpu_count()
 
 
-def _download_gs_uri(gs_uri, buffer_file_name, billing_project=None):
+# shutil.which walks PATH and stats each candidate on every call.
+# The tools don't move while we run, so cache the lookups (misses
+# included).
+_which = lru_cache(maxsize=None)(shutil.which)
+
+
+# Pick a scratch directory for staging estimated_size bytes. When
+# the file comfortably fits in memory (under a quarter of the
+# kernel's MemAvailable), /dev/shm (RAM-backed tmpfs) avoids
+# spending disk bandwidth on the intermediate file entirely --
+# TMPDIR often points at a slow disk on servers. Returns None (the
+# tempfile default, which honors TMPDIR) when the size is unknown,
+# the margin is too tight, or there's no tmpfs.
+def _scratch_dir(estimated_size):
+    if not estimated_size or not os.path.isdir("/dev/shm"):
+        return None
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    # /proc/meminfo values are in KiB.
+                    mem_available = int(line.split()[1]) * 1024
+                    break
+            else:
+                return None
+    except OSError:
+        return None
+
+    # A wide margin: the decompressed output may land in the same
+    # directory, and we mustn't starve the rest of the system.
+    if estimated_size < mem_available // 4:
+        return "/dev/shm"
+
+    return None
+
+
+# Move a file to its destination. os.rename is a pure metadata
+# operation, but only works within one filesystem; when the scratch
+# directory is on a different device than the destination (tmpfs vs.
+# ext4/NFS, say), fall back to shutil.copyfile -- which uses
+# os.sendfile on Linux, a kernel-side copy with no userspace buffer
+# -- and skip shutil.move's pointless metadata-copy step for a
+# scratch file.
+def _move_file(src_file_name, dst_file_name):
+    try:
+        os.rename(src_file_name, dst_file_name)
+    except OSError:
+        shutil.copyfile(src_file_name, dst_file_name)
+        os.unlink(src_file_name)
+
+
+# Advise the kernel about our access pattern for a file, e.g.
+# "POSIX_FADV_SEQUENTIAL" (tune readahead for a start-to-finish
+# scan) or "POSIX_FADV_DONTNEED" (drop the file's pages from the
+# page cache). Purely a hint: ignored where unsupported.
+def _fadvise(file_name, advice_name):
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(file_name, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+# Pick a chunk size for parallel transfer of file_size bytes:
+# roughly one chunk per worker, clamped so chunks are neither so
+# small that per-chunk HTTP overhead dominates, nor so large that
+# parallelism disappears. The bounds can be overridden with the
+# GS_FASTCOPY_MIN_CHUNK and GS_FASTCOPY_MAX_CHUNK environment
+# variables (in bytes).
+def _auto_chunk_size(file_size, max_workers):
+    min_chunk = int(os.environ.get("GS_FASTCOPY_MIN_CHUNK", 8 * 1024 * 1024))
+    max_chunk = int(os.environ.get("GS_FASTCOPY_MAX_CHUNK", 512 * 1024 * 1024))
+    return max(min_chunk, min(max_chunk, -(-file_size // max_workers)))
+
+
+# Fetch the blob's size, loading its metadata if necessary. Returns
+# None if the size can't be determined (e.g. the metadata request
+# fails); callers treat the size as advisory.
+def _blob_size(gs_blob):
+    try:
+        if gs_blob.size is None:
+            gs_blob.reload()
+        return gs_blob.size
+    except Exception:
+        return None
+
+
+# Constructing a storage.Client re-runs the credential lookup and
+# builds a fresh HTTP session: TLS handshakes, possibly metadata-
+# server round-trips, and no connection reuse with earlier calls.
+# The client is thread-safe, so build one and share it for the life
+# of the process. (Billing projects attach to buckets, not the
+# client, so one client serves them all.)
+_client_lock = threading.Lock()
+_client = None
+
+
+def _get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = storage.Client()
+
+            # Widen the connection pool so the transfer workers can
+            # all keep a socket; best-effort, the session layout is
+            # not a public API.
+            try:
+                from requests.adapters import HTTPAdapter
+
+                pool_size = max(32, _get_available_cpus() * 4)
+                client._http.mount(
+                    "https://",
+                    HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size),
+                )
+            except Exception:
+                pass
+
+            _client = client
+    return _client
+
+
+# Parse a gs:// URI into a Blob, attaching the billing project
+# to the bucket if one was given.
+def _gs_blob(gs_uri, billing_project=None):
+    client = _get_client()
+    parsed_uri = storage.Blob.from_string(gs_uri, client=client)
+    if billing_project:
+        bucket = client.bucket(parsed_uri.bucket.name, user_project=billing_project)
+    else:
+        bucket = client.bucket(parsed_uri.bucket.name)
+    return storage.Blob(parsed_uri.name, bucket)
+
+
+def _download_gs_uri(
+    gs_uri, buffer_file_name, max_workers, chunk_size, billing_project
+):
+    try:
+        gs_blob = _gs_blob(gs_uri, billing_project)
+    except DefaultCredentialsError:
+        # No SDK credentials: the gcloud tool may still be set up
+        # (e.g. with user credentials), so fall back to it.
+        _download_gs_uri_with_gcloud(gs_uri, buffer_file_name, billing_project)
+        return
+
+    size = _blob_size(gs_blob)
+
+    if size is not None and size < _simple_transfer_threshold():
+        # Small object: one GET beats the chunked machinery. Hand
+        # the client a file with a large write buffer -- its default
+        # is a few KiB, costing a write syscall per socket read --
+        # and ask for the raw bytes: read() does its own gzip
+        # handling, so the client's transparent decompression would
+        # only get in the way.
+        with open(buffer_file_name, "wb", buffering=8 * 1024 * 1024) as f:
+            gs_blob.download_to_file(f, raw_download=True, checksum="crc32c")
+        return
+
+    if chunk_size is None and size:
+        chunk_size = _auto_chunk_size(size, max_workers)
+
+    # Note: preallocating the destination with posix_fallocate is
+    # tempting (the workers write chunks at scattered offsets), but
+    # download_chunks_concurrently truncates the file itself before
+    # writing, which would deallocate the reserved extents again.
+    # The library offers no hook after its truncate, so we don't.
+
+    # CRC32C verification is explicit: it's hardware-accelerated
+    # (the CRC32 instruction on x86 and ARM via google-crc32c),
+    # unlike MD5, so it stays off the transfer's critical path.
+    args = {"max_workers": max_workers, "crc32c_checksum": True}
+    if chunk_size is not None:
+        args["chunk_size"] = chunk_size
+
+    # TODO: handle errors in transfer_manager
+    transfer_manager.download_chunks_concurrently(gs_blob, buffer_file_name, **args)
+
+
+def _download_gs_uri_with_gcloud(gs_uri, buffer_file_name, billing_project=None):
     gcloud_cmd = ["gcloud", "storage", "cp"]
     if billing_project:
         gcloud_cmd += ["--billing-project", billing_project]
@@ -206,19 +666,41 @@ def _download_gs_uri(gs_uri, buffer_file_name, billing_project=None):
         )
 
 
-def _write_gs_uri(buffer_file_name, gs_uri, max_workers, chunk_size, billing_project):
-    args = {"max_workers": max_workers}
-    if chunk_size is not None:
-        args["chunk_size"] = chunk_size
-
-    # Parse gs_uri into a blob
-    client = storage.Client()
-    parsed_uri = storage.Blob.from_string(gs_uri, client=client)
-    if billing_project:
-        bucket = client.bucket(parsed_uri.bucket.name, user_project=billing_project)
-    else:
-        bucket = client.bucket(parsed_uri.bucket.name)
-    gs_blob = storage.Blob(parsed_uri.name, bucket)
+# Below this size, a single request is faster than the parallel
+# chunked transfer, which costs extra round-trips to initiate and
+# finalize. The threshold can be overridden with the
+# GS_FASTCOPY_MPU_THRESHOLD environment variable (in bytes).
+def _simple_transfer_threshold():
+    return int(os.environ.get("GS_FASTCOPY_MPU_THRESHOLD", 8 * 1024 * 1024))
+
+
+def _write_gs_uri(
+    buffer_file_name,
+    gs_uri,
+    max_workers,
+    chunk_size,
+    billing_project,
+    content_encoding=None,
+    worker_type=None,
+):
+    gs_blob = _gs_blob(gs_uri, billing_project)
+    if content_encoding:
+        gs_blob.content_encoding = content_encoding
+
+    st_size = os.path.getsize(buffer_file_name)
+    if st_size < _simple_transfer_threshold():
+        # Small file: skip the multipart machinery entirely.
+        gs_blob.upload_from_filename(buffer_file_name, checksum="crc32c")
+        return
+
+    if chunk_size is None:
+        chunk_size = _auto_chunk_size(st_size, max_workers)
+
+    args = {"max_workers": max_workers, "chunk_size": chunk_size}
+    if worker_type is not None:
+        args["worker_type"] = worker_type
 
     # TODO: handle errors in transfer_manager
-    transfer_manager.upload_chunks_concurrently(buffer_file_name, gs_blob, **args)
+    transfer_manager.upload_chunks_concurrently(
+        buffer_file_name, gs_blob, checksum="crc32c", **args
+    )
@@ -0,0 +1,31 @@
+import pytest
+from unittest.mock import MagicMock
+
+import gs_fastcopy
+
+
+# A stand-in for storage.Client that builds real Bucket objects
+# without looking up credentials. This keeps the tests hermetic:
+# no ambient auth, no network, and no gcloud fallback.
+def storage_client_mock():
+    client = MagicMock()
+    client.bucket.side_effect = (
+        lambda name, user_project=None: gs_fastcopy.storage.Bucket(
+            client, name, user_project=user_project
+        )
+    )
+    # blob.reload() reads metadata through client._get_resource;
+    # report a size well over the simple-transfer threshold so
+    # these tests exercise the chunked download path.
+    client._get_resource.return_value = {"size": str(100 * 1024 * 1024)}
+    return client
+
+
+# gs_fastcopy caches its storage.Client for the life of the process.
+# Tests patch storage.Client in various ways, so reset the cache
+# between tests to keep them independent.
+@pytest.fixture(autouse=True)
+def reset_client_cache():
+    gs_fastcopy._client = None
+    yield
+    gs_fastcopy._client = None
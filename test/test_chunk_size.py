@@ -0,0 +1,55 @@
+import os
+from unittest.mock import ANY, patch
+
+import gs_fastcopy
+
+JSON_STR = b'{"A": 3}'
+
+MiB = 1024 * 1024
+
+
+def test_auto_chunk_size_one_chunk_per_worker():
+    assert gs_fastcopy._auto_chunk_size(100 * MiB, 4) == 25 * MiB
+
+
+def test_auto_chunk_size_clamps_small_files():
+    # Tiny chunks would pay more in per-chunk HTTP overhead
+    # than they gain in parallelism.
+    assert gs_fastcopy._auto_chunk_size(1024, 4) == 8 * MiB
+
+
+def test_auto_chunk_size_clamps_huge_files():
+    assert gs_fastcopy._auto_chunk_size(100 * 1024 * MiB, 4) == 512 * MiB
+
+
+@patch.dict(
+    os.environ,
+    {"GS_FASTCOPY_MIN_CHUNK": "1024", "GS_FASTCOPY_MAX_CHUNK": "2048"},
+)
+def test_auto_chunk_size_env_overrides():
+    assert gs_fastcopy._auto_chunk_size(512, 1) == 1024
+    assert gs_fastcopy._auto_chunk_size(1024 * MiB, 1) == 2048
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_download_auto_chunk_size(mock_download, mock_gs_blob):
+    # The blob's size drives the download chunk size.
+    mock_gs_blob.return_value.size = 100 * MiB
+
+    def download_mock(gs_blob, filename, **kwargs):
+        with open(filename, "wb") as f:
+            f.write(JSON_STR)
+
+    mock_download.side_effect = download_mock
+
+    with gs_fastcopy.read("gs://my-bucket/my-file.json", max_workers=4) as f:
+        _ = f.read()
+
+    mock_download.assert_called_once_with(
+        ANY,
+        ANY,
+        max_workers=4,
+        chunk_size=25 * MiB,
+        crc32c_checksum=True,
+    )
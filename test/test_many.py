@@ -0,0 +1,55 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import gs_fastcopy
+
+JSON_STR = b'{"A": 3}'
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+def test_read_many(mock_gs_blob):
+    def download_to_filename_mock(filename, **kwargs):
+        with open(filename, "wb") as f:
+            f.write(JSON_STR)
+
+    mock_gs_blob.return_value.download_to_filename.side_effect = (
+        download_to_filename_mock
+    )
+
+    uris = [f"gs://my-bucket/file-{n}.json" for n in range(5)]
+
+    with tempfile.TemporaryDirectory() as dest_dir:
+        results = dict(gs_fastcopy.read_many(uris, dest_dir))
+
+        assert set(results.keys()) == set(uris)
+        for gs_uri, file_name in results.items():
+            assert file_name == os.path.join(dest_dir, os.path.basename(gs_uri))
+            with open(file_name, "rb") as f:
+                assert f.read() == JSON_STR
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+def test_write_many(mock_gs_blob):
+    uploaded = []
+
+    def upload_from_filename_mock(filename, **kwargs):
+        with open(filename, "rb") as f:
+            uploaded.append(f.read())
+
+    mock_gs_blob.return_value.upload_from_filename.side_effect = (
+        upload_from_filename_mock
+    )
+
+    with tempfile.TemporaryDirectory() as src_dir:
+        pairs = []
+        for n in range(5):
+            file_name = os.path.join(src_dir, f"file-{n}.json")
+            with open(file_name, "wb") as f:
+                f.write(JSON_STR)
+            pairs.append((file_name, f"gs://my-bucket/file-{n}.json"))
+
+        results = list(gs_fastcopy.write_many(pairs))
+
+        assert sorted(results) == sorted(pairs)
+        assert uploaded == [JSON_STR] * 5
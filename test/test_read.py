@@ -1,9 +1,13 @@
 import gzip
+import io
 import os
 import subprocess
 import tempfile
 from unittest.mock import ANY, patch
 
+from callee import Attrs
+from conftest import storage_client_mock
+
 import gs_fastcopy
 
 JSON_STR = b'{"A": 3}'
@@ -27,8 +31,19 @@ def subprocess_run_mock(*args, **kwargs):
         return builtin_run(*args, **kwargs)
 
 
-@patch.object(gs_fastcopy.subprocess, "run", new_callable=lambda: subprocess_run_mock)
-def test_read_no_compression(_mock_run):
+# This intercepts the download API call to gcloud storage,
+# and writes a file to the given filename.
+def download_chunks_concurrently_mock(gs_blob, filename, **kwargs):
+    with open(filename, "wb") as f:
+        contents = gzip.compress(JSON_STR) if filename.endswith(".gz") else JSON_STR
+        f.write(contents)
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_read_no_compression(mock_download, _mock_client):
+    mock_download.side_effect = download_chunks_concurrently_mock
+
     with gs_fastcopy.read("gs://my-bucket/my-file.json") as f:
         result = f.read()
 
@@ -49,8 +64,26 @@ def test_read_local_no_compression():
             assert result == JSON_STR
 
 
-@patch.object(gs_fastcopy.subprocess, "run", new_callable=lambda: subprocess_run_mock)
-def test_read_with_compression(_mock_run):
+# This intercepts the blob streaming open, serving the
+# gzipped contents as if downloaded from gcloud storage.
+@patch.object(gs_fastcopy, "_gs_blob")
+def test_read_with_compression(mock_gs_blob):
+    mock_gs_blob.return_value.open.return_value = io.BytesIO(gzip.compress(JSON_STR))
+
+    with gs_fastcopy.read("gs://my-bucket/my-file.json.gz") as f:
+        result = f.read()
+
+    assert result == JSON_STR
+    mock_gs_blob.return_value.open.assert_called_once_with("rb")
+
+
+@patch.object(gs_fastcopy, "rapidgzip", new=None)
+@patch.object(gs_fastcopy, "igzip_threaded", new=None)
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_read_with_compression_no_isal(mock_download, _mock_client):
+    mock_download.side_effect = download_chunks_concurrently_mock
+
     with gs_fastcopy.read("gs://my-bucket/my-file.json.gz") as f:
         result = f.read()
 
@@ -71,25 +104,129 @@ def test_read_local_with_compression():
             assert result == JSON_STR
 
 
-@patch.object(gs_fastcopy.subprocess, "run")
-def test_read_billing_project(mock_run):
-    mock_run.side_effect = subprocess_run_mock
+@patch.object(gs_fastcopy, "rapidgzip", new=None)
+def test_read_local_with_compression_no_rapidgzip():
+    with tempfile.NamedTemporaryFile(suffix=".gz") as tmp_file:
+        with gzip.open(tmp_file.name, "wb") as fgz:
+            fgz.write(JSON_STR)
+
+        with gs_fastcopy.read(tmp_file.name) as f:
+            result = f.read()
+            assert result == JSON_STR
+
+
+@patch.object(gs_fastcopy, "rapidgzip", new=None)
+@patch.object(gs_fastcopy, "igzip_threaded", new=None)
+def test_read_local_with_compression_no_isal():
+    with tempfile.NamedTemporaryFile(suffix=".gz") as tmp_file:
+        with gzip.open(tmp_file.name, "wb") as fgz:
+            fgz.write(JSON_STR)
+
+        with gs_fastcopy.read(tmp_file.name) as f:
+            result = f.read()
+            assert result == JSON_STR
+
+        # The archive is piped through the tool, not handed to it
+        # by name, so the original file survives.
+        assert os.path.exists(tmp_file.name)
+
+
+@patch.object(gs_fastcopy, "rapidgzip", new=None)
+@patch.object(gs_fastcopy, "igzip_threaded", new=None)
+@patch.object(gs_fastcopy, "_scratch_dir")
+def test_read_fallback_skips_ram_staging(mock_scratch_dir):
+    mock_scratch_dir.return_value = None
+
+    with tempfile.NamedTemporaryFile(suffix=".gz") as tmp_file:
+        with gzip.open(tmp_file.name, "wb") as fgz:
+            fgz.write(JSON_STR)
+
+        with gs_fastcopy.read(tmp_file.name) as f:
+            assert f.read() == JSON_STR
+
+    # The external tool stages the decompressed output in scratch
+    # too, so the compressed-size estimate is withheld and RAM
+    # staging is never chosen.
+    mock_scratch_dir.assert_called_once_with(None)
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+def test_read_billing_project(mock_gs_blob):
+    mock_gs_blob.return_value.open.return_value = io.BytesIO(gzip.compress(JSON_STR))
 
     with gs_fastcopy.read(
         "gs://my-bucket/my-file.json.gz", billing_project="project123"
     ) as f:
         _ = f.read()
 
-    mock_run.assert_any_call(
-        [
-            "gcloud",
-            "storage",
-            "cp",
-            "--billing-project",
-            "project123",
-            "gs://my-bucket/my-file.json.gz",
-            ANY,
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.PIPE,
+    mock_gs_blob.assert_called_once_with("gs://my-bucket/my-file.json.gz", "project123")
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_read_billing_project_download(mock_download, _mock_client):
+    mock_download.side_effect = download_chunks_concurrently_mock
+
+    with gs_fastcopy.read(
+        "gs://my-bucket/my-file.json", billing_project="project123"
+    ) as f:
+        _ = f.read()
+
+    mock_download.assert_called_once_with(
+        Attrs(
+            name="my-file.json",
+            bucket=Attrs(name="my-bucket", user_project="project123"),
+        ),
+        ANY,
+        max_workers=ANY,
+        chunk_size=ANY,
+        crc32c_checksum=True,
     )
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_read_small_object_simple_download(mock_download, mock_gs_blob):
+    # Below the threshold: one GET, no chunked machinery.
+    mock_gs_blob.return_value.size = 1024
+
+    def download_to_file_mock(file_obj, **kwargs):
+        file_obj.write(JSON_STR)
+
+    mock_gs_blob.return_value.download_to_file.side_effect = download_to_file_mock
+
+    with gs_fastcopy.read("gs://my-bucket/my-file.json") as f:
+        assert f.read() == JSON_STR
+
+    mock_download.assert_not_called()
+    mock_gs_blob.return_value.download_to_file.assert_called_once_with(
+        ANY, raw_download=True, checksum="crc32c"
+    )
+
+
+@patch.object(gs_fastcopy, "_gs_blob")
+@patch.object(gs_fastcopy.transfer_manager, "download_chunks_concurrently")
+def test_read_simple_download_threshold_override(mock_download, mock_gs_blob):
+    # Lowering the threshold routes even a tiny object through
+    # the chunked download.
+    mock_gs_blob.return_value.size = 1024
+    mock_download.side_effect = download_chunks_concurrently_mock
+
+    with patch.dict(os.environ, {"GS_FASTCOPY_MPU_THRESHOLD": "512"}):
+        with gs_fastcopy.read("gs://my-bucket/my-file.json") as f:
+            assert f.read() == JSON_STR
+
+    mock_download.assert_called_once()
+    mock_gs_blob.return_value.download_to_file.assert_not_called()
+
+
+@patch.object(gs_fastcopy.subprocess, "run", new_callable=lambda: subprocess_run_mock)
+@patch.object(gs_fastcopy.storage, "Client")
+def test_read_gcloud_fallback(mock_client, _mock_run):
+    # Without SDK credentials, downloads fall back to the gcloud tool.
+    mock_client.side_effect = gs_fastcopy.DefaultCredentialsError("no credentials")
+
+    with gs_fastcopy.read("gs://my-bucket/my-file.json") as f:
+        result = f.read()
+
+    assert result == JSON_STR
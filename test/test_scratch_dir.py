@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+import gs_fastcopy
+
+ON_LINUX = os.path.isdir("/dev/shm") and os.path.exists("/proc/meminfo")
+
+
+@pytest.mark.skipif(not ON_LINUX, reason="needs /dev/shm and /proc/meminfo")
+def test_scratch_dir_small_file():
+    assert gs_fastcopy._scratch_dir(1024) == "/dev/shm"
+
+
+def test_scratch_dir_huge_file():
+    # Nobody has a quarter of an exbibyte of RAM to spare.
+    assert gs_fastcopy._scratch_dir(1 << 60) is None
+
+
+def test_scratch_dir_unknown_size():
+    assert gs_fastcopy._scratch_dir(None) is None
@@ -4,11 +4,16 @@ import tempfile
 from unittest.mock import ANY, patch
 
 from callee import Attrs
+from conftest import storage_client_mock
 
 import gs_fastcopy
 
 JSON_STR = b'{"A": 3}'
 
+# Big enough to clear the simple-upload threshold (8 MiB),
+# routing the upload through the multipart path.
+BIG_STR = b"x" * (9 * 1024 * 1024)
+
 
 # This intercepts the upload API call to gcloud storage,
 # and writes what would've been written into a one-array
@@ -26,15 +31,33 @@ def build_upload_chunks_concurrently_mock(result):
     return side_effecter
 
 
+# Same, for the simple (non-multipart) upload used for small files.
+# Note the gs_blob argument: the mocks patch the unbound method.
+def build_upload_from_filename_mock(result):
+    def side_effecter(gs_blob, buffer_file_name, **kwargs):
+        nonlocal result
+
+        with open(buffer_file_name, "rb") as f:
+            result[0] = f.read()
+
+        if buffer_file_name.endswith(".gz"):
+            result[0] = gzip.decompress(result[0])
+
+    return side_effecter
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
 @patch.object(
-    gs_fastcopy.transfer_manager,
-    "upload_chunks_concurrently",
+    gs_fastcopy.storage.Blob,
+    "upload_from_filename",
+    autospec=True,
 )
-def test_write_no_compression(mock_run):
+def test_write_no_compression(mock_upload, _mock_client):
     result = [None]
 
     # Set up the mock to intercept the write to gcloud storage.
-    mock_run.side_effect = build_upload_chunks_concurrently_mock(result)
+    # (Small files skip the multipart upload.)
+    mock_upload.side_effect = build_upload_from_filename_mock(result)
 
     with gs_fastcopy.write("gs://my-bucket/my-file.json") as f:
         f.write(JSON_STR)
@@ -42,22 +65,102 @@ def test_write_no_compression(mock_run):
     assert result[0] == JSON_STR
 
 
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
 @patch.object(
     gs_fastcopy.transfer_manager,
     "upload_chunks_concurrently",
 )
-def test_write_with_compression(mock_upload):
+def test_write_no_compression_large(mock_upload, _mock_client):
     result = [None]
 
     # Set up the mock to intercept the write to gcloud storage.
+    # (Large files take the multipart upload path.)
     mock_upload.side_effect = build_upload_chunks_concurrently_mock(result)
 
+    with gs_fastcopy.write("gs://my-bucket/my-file.json") as f:
+        f.write(BIG_STR)
+
+    assert result[0] == BIG_STR
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(
+    gs_fastcopy.storage.Blob,
+    "upload_from_filename",
+    autospec=True,
+)
+def test_write_with_compression(mock_upload, _mock_client):
+    result = [None]
+
+    # Set up the mock to intercept the write to gcloud storage.
+    mock_upload.side_effect = build_upload_from_filename_mock(result)
+
     with gs_fastcopy.write("gs://my-bucket/my-file.json.gz") as f:
         f.write(JSON_STR)
 
     assert result[0] == JSON_STR
 
 
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(gs_fastcopy, "igzip_threaded", new=None)
+@patch.object(
+    gs_fastcopy.storage.Blob,
+    "upload_from_filename",
+    autospec=True,
+)
+def test_write_with_compression_no_isal(mock_upload, _mock_client):
+    result = [None]
+
+    # Set up the mock to intercept the write to gcloud storage.
+    mock_upload.side_effect = build_upload_from_filename_mock(result)
+
+    with gs_fastcopy.write("gs://my-bucket/my-file.json.gz") as f:
+        f.write(JSON_STR)
+
+    assert result[0] == JSON_STR
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(
+    gs_fastcopy.storage.Blob,
+    "upload_from_filename",
+    autospec=True,
+)
+def test_write_compress_never(mock_upload, _mock_client):
+    result = [None]
+
+    mock_upload.side_effect = build_upload_from_filename_mock(result)
+
+    # Pre-compressed payload: skip local compression.
+    with gs_fastcopy.write("gs://my-bucket/my-file.json.gz", compress="never") as f:
+        f.write(gzip.compress(JSON_STR))
+
+    assert gzip.decompress(result[0]) == JSON_STR
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(
+    gs_fastcopy.storage.Blob,
+    "upload_from_filename",
+    autospec=True,
+)
+def test_write_compress_always(mock_upload, _mock_client):
+    result = [None]
+
+    mock_upload.side_effect = build_upload_from_filename_mock(result)
+
+    # No '.gz' suffix: compressed anyway, marked Content-Encoding: gzip.
+    with gs_fastcopy.write("gs://my-bucket/my-file.json", compress="always") as f:
+        f.write(JSON_STR)
+
+    assert result[0] == JSON_STR
+    mock_upload.assert_called_once_with(
+        Attrs(content_encoding="gzip"),
+        ANY,
+        checksum="crc32c",
+    )
+
+
 def test_write_local_no_compression():
     with tempfile.NamedTemporaryFile() as tmp_file:
         with gs_fastcopy.write(tmp_file.name) as f:
@@ -73,6 +176,22 @@ def test_write_local_no_compression():
             assert f.read() == JSON_STR
 
 
+def test_move_file_cross_device():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src = os.path.join(tmp_dir, "src")
+        dst = os.path.join(tmp_dir, "dst")
+        with open(src, "wb") as f:
+            f.write(JSON_STR)
+
+        # Simulate a cross-device move: rename fails, copy+unlink.
+        with patch.object(gs_fastcopy.os, "rename", side_effect=OSError):
+            gs_fastcopy._move_file(src, dst)
+
+        assert not os.path.exists(src)
+        with open(dst, "rb") as f:
+            assert f.read() == JSON_STR
+
+
 def test_write_local_with_compression():
     with tempfile.NamedTemporaryFile(suffix=".gz") as tmp_file:
         with gs_fastcopy.write(tmp_file.name) as f:
@@ -88,6 +207,7 @@ def test_write_local_with_compression():
             assert f.read() == JSON_STR
 
 
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
 @patch.object(
     gs_fastcopy,
     "_get_available_cpus",
@@ -96,41 +216,66 @@ def test_write_local_with_compression():
     gs_fastcopy.transfer_manager,
     "upload_chunks_concurrently",
 )
-def test_write_default_workers(mock_upload, mock_get_cpus):
+def test_write_default_workers(mock_upload, mock_get_cpus, _mock_client):
     mock_get_cpus.return_value = 123
 
     with gs_fastcopy.write("gs://my-bucket/my-file.json") as f:
-        f.write(JSON_STR)
+        f.write(BIG_STR)
 
     mock_upload.assert_called_once_with(
         ANY,
         ANY,
         max_workers=123,
+        chunk_size=ANY,
+        checksum="crc32c",
     )
 
 
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
 @patch.object(
     gs_fastcopy.transfer_manager,
     "upload_chunks_concurrently",
 )
-def test_write_custom_workers(mock_upload):
+def test_write_custom_workers(mock_upload, _mock_client):
     with gs_fastcopy.write("gs://my-bucket/my-file.json", max_workers=16) as f:
-        f.write(JSON_STR)
+        f.write(BIG_STR)
 
     mock_upload.assert_called_once_with(
         ANY,
         ANY,
         max_workers=16,
+        chunk_size=ANY,
+        checksum="crc32c",
     )
 
 
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
 @patch.object(
     gs_fastcopy.transfer_manager,
     "upload_chunks_concurrently",
 )
-def test_write_billing_project(mock_upload):
+def test_write_worker_type(mock_upload, _mock_client):
+    with gs_fastcopy.write("gs://my-bucket/my-file.json", worker_type="thread") as f:
+        f.write(BIG_STR)
+
+    mock_upload.assert_called_once_with(
+        ANY,
+        ANY,
+        max_workers=ANY,
+        chunk_size=ANY,
+        checksum="crc32c",
+        worker_type="thread",
+    )
+
+
+@patch.object(gs_fastcopy.storage, "Client", new_callable=lambda: storage_client_mock)
+@patch.object(
+    gs_fastcopy.transfer_manager,
+    "upload_chunks_concurrently",
+)
+def test_write_billing_project(mock_upload, _mock_client):
     with gs_fastcopy.write("gs://my-bucket/my-file.json", billing_project="test") as f:
-        f.write(JSON_STR)
+        f.write(BIG_STR)
 
     mock_upload.assert_called_once_with(
         ANY,
@@ -139,4 +284,6 @@ def test_write_billing_project(mock_upload):
             bucket=Attrs(name="my-bucket", user_project="test"),
         ),
         max_workers=ANY,
+        chunk_size=ANY,
+        checksum="crc32c",
     )